@@ -0,0 +1,34 @@
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.rag.vastu_rag_engine import normalize_room_name, get_canonical_constraints
+
+# name -> (normalize_room_name, canonical allowed_quadrants or None)
+CASES = {
+    "Kitchen":        ("kitchen",        ["SE"]),
+    "Master Bed 2":   ("master bedroom", ["SW"]),
+    "Master Bedroom": ("master bedroom", ["SW"]),
+    "Master Bath":    ("toilet",         ["NW", "W"]),
+    "Bed 1":          ("bedroom",        ["S", "SW", "W"]),
+    "Kids Bed":       ("bedroom",        ["S", "SW", "W"]),
+    "Hall":           ("living room",    ["NE", "N", "E"]),
+    "Living Area":    ("living room",    ["NE", "N", "E"]),
+    "Living Hall":    ("living room",    ["NE", "N", "E"]),
+    "Living/Dining":  ("living room",    ["NE", "N", "E"]),
+    "Dining Hall":    ("dining",         ["E", "SE"]),
+    "Guest Bathroom": ("toilet",         ["NW", "W"]),
+    "Toilet_2":       ("toilet",         ["NW", "W"]),
+    "Washroom":       ("toilet",         ["NW", "W"]),
+    "Puja Room":      ("pooja",          ["NE"]),
+    "Study 1":        ("study",          None),
+}
+
+failed = 0
+for name, (norm, quadrants) in CASES.items():
+    rule = get_canonical_constraints(name)
+    got = (normalize_room_name(name), rule and rule["allowed_quadrants"])
+    if got != (norm, quadrants) or (rule and rule["room"] != name):
+        failed += 1
+        print(f"FAIL: {name!r} -> {got}, expected {(norm, quadrants)}")
+
+print("OK:" if not failed else "FAIL:", len(CASES) - failed, "/", len(CASES), "room names")
+sys.exit(1 if failed else 0)
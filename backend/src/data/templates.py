@@ -467,8 +467,11 @@ def _scale_constrained(rooms, target_w, target_d, orig_w, orig_d):
                 'h': round(new_h, 3),
             }))
 
-    result.sort(key=lambda t: t[0])
-    return [r for _, r in result]
+    # Restore input order by direct placement — indices are unique, no sort needed
+    ordered = [None] * len(rooms)
+    for i, r in result:
+        ordered[i] = r
+    return ordered
 
 
 # ---------------------------------------------------------------------------
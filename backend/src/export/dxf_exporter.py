@@ -112,19 +112,18 @@ def generate_professional_dxf(
         add_seg(x1, y2, x1, y1)
 
     # ── STEP 2: draw double-line walls ────────────────────────────────
+    ext_attr = {"layer": "A-WALL-EXT", "lineweight": 70}
+    int_attr = {"layer": "A-WALL-INT", "lineweight": 25}
     for (wx1, wy1, wx2, wy2), is_outer in wall_segments.items():
         gap   = OUTER_GAP if is_outer else INNER_GAP
-        layer = "A-WALL-EXT" if is_outer else "A-WALL-INT"
-        lw    = 70 if is_outer else 25
+        attrs = ext_attr if is_outer else int_attr
 
         if abs(wy2 - wy1) < 10:   # horizontal wall
             for dy in (gap, -gap):
-                msp.add_line((wx1, wy1 + dy), (wx2, wy1 + dy),
-                             dxfattribs={"layer": layer, "lineweight": lw})
+                msp.add_line((wx1, wy1 + dy), (wx2, wy1 + dy), dxfattribs=attrs)
         else:                       # vertical wall
             for dx in (gap, -gap):
-                msp.add_line((wx1 + dx, wy1), (wx1 + dx, wy2),
-                             dxfattribs={"layer": layer, "lineweight": lw})
+                msp.add_line((wx1 + dx, wy1), (wx1 + dx, wy2), dxfattribs=attrs)
 
     # ── STEP 3: plot boundary ──────────────────────────────────────────
     msp.add_lwpolyline(
@@ -174,6 +173,10 @@ def generate_professional_dxf(
         )
 
     # ── STEP 5: rooms — labels, area, per-room dims, doors, windows ───
+    # ezdxf copies dxfattribs, so one dict per layer is shared by every entity
+    door_attr = {"layer": "A-DOOR"}
+    dims_attr = {"layer": "A-DIMS"}
+
     for room in rooms_data:
         rx = room["x"] * 1000.0
         ry = fy(room["y"], room["h"])
@@ -212,7 +215,7 @@ def generate_professional_dxf(
                 base=(cx, ry - R_OFF),
                 p1=(rx, ry), p2=(rx + rw, ry),
                 angle=0, dimstyle=ds_name,
-                dxfattribs={"layer": "A-DIMS"},
+                dxfattribs=dims_attr,
             )
             d.render()
         except Exception:
@@ -223,7 +226,7 @@ def generate_professional_dxf(
                 base=(rx + rw + R_OFF, cy),
                 p1=(rx + rw, ry), p2=(rx + rw, ry + rh),
                 angle=90, dimstyle=ds_name,
-                dxfattribs={"layer": "A-DIMS"},
+                dxfattribs=dims_attr,
             )
             d.render()
         except Exception:
@@ -240,30 +243,30 @@ def generate_professional_dxf(
                 hx, hy = rx + rw * pos, ry + rh
                 msp.add_arc(center=(hx, hy), radius=dr,
                             start_angle=270, end_angle=360,
-                            dxfattribs={"layer": "A-DOOR"})
+                            dxfattribs=door_attr)
                 msp.add_line((hx, hy), (hx, hy - dr),
-                             dxfattribs={"layer": "A-DOOR"})
+                             dxfattribs=door_attr)
             elif dw == "S":
                 hx, hy = rx + rw * pos, ry
                 msp.add_arc(center=(hx, hy), radius=dr,
                             start_angle=0, end_angle=90,
-                            dxfattribs={"layer": "A-DOOR"})
+                            dxfattribs=door_attr)
                 msp.add_line((hx, hy), (hx, hy + dr),
-                             dxfattribs={"layer": "A-DOOR"})
+                             dxfattribs=door_attr)
             elif dw == "E":
                 hx, hy = rx + rw, ry + rh * pos
                 msp.add_arc(center=(hx, hy), radius=dr,
                             start_angle=90, end_angle=180,
-                            dxfattribs={"layer": "A-DOOR"})
+                            dxfattribs=door_attr)
                 msp.add_line((hx, hy), (hx - dr, hy),
-                             dxfattribs={"layer": "A-DOOR"})
+                             dxfattribs=door_attr)
             elif dw == "W":
                 hx, hy = rx, ry + rh * pos
                 msp.add_arc(center=(hx, hy), radius=dr,
                             start_angle=0, end_angle=90,
-                            dxfattribs={"layer": "A-DOOR"})
+                            dxfattribs=door_attr)
                 msp.add_line((hx, hy), (hx + dr, hy),
-                             dxfattribs={"layer": "A-DOOR"})
+                             dxfattribs=door_attr)
 
         # ── Window — 3 parallel lines (ALL windows, not just outer) ──
         win = room.get("window")
@@ -393,8 +396,11 @@ def generate_professional_dxf(
                      "height": value_h,
                      "insert": (COL_DIV + pad, row_y - value_h * 0.1)})
 
+    # ── Initial view: plan + dims + title block ─────────────────────────
+    doc.set_modelspace_vport(height=max(W, D) * 1.5,
+                             center=(W / 2, (D + TB_Y) / 2))
+
     # ── Serialize ──────────────────────────────────────────────────────
     sio = StringIO()
     doc.write(sio)
-    sio.seek(0)
-    return sio.read().encode("utf-8")
+    return sio.getvalue().encode("utf-8")
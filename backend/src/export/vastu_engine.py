@@ -238,7 +238,11 @@ def generate_clean_dxf(rooms_data, plot_w, plot_d, client_name="Client"):
         }
     )
 
-    # Write to bytes
-    stream = io.BytesIO()
+    # Initial view framed on the plot and title block
+    doc.set_modelspace_vport(height=max(plot_w, plot_d) * 1.5,
+                             center=(plot_w / 2, (plot_d + tb_y - 2.5) / 2))
+
+    # Write to bytes — ASCII DXF is text, so serialise in memory and encode
+    stream = io.StringIO()
     doc.write(stream)
-    return stream.getvalue()
+    return stream.getvalue().encode('utf-8')
@@ -1,30 +1,271 @@
 import os
+import re
 import json
+import atexit
+import shelve
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
+
+# Keep HF weights in one persistent place so a fresh session never re-downloads.
+# Must be set before sentence_transformers is first imported (lazily, below).
+os.environ.setdefault(
+    "SENTENCE_TRANSFORMERS_HOME",
+    os.path.join(os.path.expanduser("~"), ".cache", "sentence_transformers"),
+)
+
+# LangChain, Chroma, torch and the Gemini client are imported inside the
+# functions that use them, so importing this module (or taking the no-context
+# fallback path) stays cheap.
 
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 PDF_DIR = "PDF"
 DB_DIR = "db_vastu_rules"
+CACHE_PATH = "rag_cache.db"
+SEMANTIC_CACHE_PATH = "rag_semantic_cache.npz"
+SEMANTIC_THRESHOLD = 0.92
+ONNX_MODEL_DIR = os.getenv("VASTU_ONNX_MODEL_DIR", os.path.join("models", "all-MiniLM-L6-v2-onnx"))
+
+# ---------------------------------------------------------------------------
+# Rule cache — in-memory dict backed by a shelve file so repeated room types
+# skip both Chroma retrieval and the LLM call across sessions.
+# ---------------------------------------------------------------------------
+
+# Room-type keywords in precedence order — the first one found in the name
+# wins, so "Master Bath" is a toilet, "Living/Dining" a living room and
+# "Dining Hall" a dining room. Types are the get_fallback_constraints keys.
+_ROOM_TYPE_KEYWORDS = [
+    ("toilet",   "Toilet"),
+    ("bath",     "Toilet"),
+    ("washroom", "Toilet"),
+    ("pooja",    "Pooja"),
+    ("puja",     "Pooja"),
+    ("kitchen",  "Kitchen"),
+    ("master",   "Master Bedroom"),
+    ("bed",      "Bedroom"),
+    ("living",   "Living Room"),
+    ("dining",   "Dining"),
+    ("hall",     "Living Room"),
+]
+
+_memo: Dict[str, object] = {}
+_cache_lock = threading.Lock()   # shelve is not safe for concurrent writers
+
+try:
+    _store: Optional[shelve.Shelf] = shelve.open(CACHE_PATH)
+    atexit.register(_store.close)
+except Exception as e:
+    print(f"[WARN] RAG cache disabled: {e}")
+    _store = None
+
+
+def _room_type(room_name):
+    name = room_name.lower()
+    for keyword, room_type in _ROOM_TYPE_KEYWORDS:
+        if keyword in name:
+            return room_type
+    return None
+
+
+def normalize_room_name(room_name):
+    """'Master Bed 2' -> 'master bedroom', 'Puja Room' -> 'pooja', 'Study 1' -> 'study'."""
+    name = re.sub(r"[\d_]+", " ", room_name.lower())
+    name = " ".join(name.split())
+    room_type = _room_type(name)
+    return room_type.lower() if room_type else name
+
+
+def _kb_version(db_dir=DB_DIR):
+    """Newest mtime in the vector store, so re-ingesting retires cached contexts."""
+    try:
+        with os.scandir(db_dir) as entries:
+            stamps = [e.stat().st_mtime for e in entries]
+        return int(max(stamps, default=os.path.getmtime(db_dir)))
+    except OSError:
+        return 0
+
+
+def _cache_get(key):
+    if key in _memo:
+        return _memo[key]
+    with _cache_lock:
+        if _store is not None and key in _store:
+            _memo[key] = _store[key]
+            return _memo[key]
+    return None
+
+
+def _cache_set(key, value):
+    with _cache_lock:
+        _memo[key] = value
+        if _store is not None:
+            _store[key] = value
+            _store.sync()
+
+
+# ---------------------------------------------------------------------------
+# Semantic cache — "Guest Bedroom", "Kid Bed" and "Master Bed" embed close
+# together, so an LSH bucket + cosine check lets spelling variants share one
+# extracted rule. Entries carry the digest of the context they were extracted
+# from and only match that same context. Shares the embedder singleton with
+# the retriever.
+# ---------------------------------------------------------------------------
+
+_LSH_PLANES = np.random.RandomState(0).randn(8, 384)
+_semantic_cache: Dict[int, List[Tuple[np.ndarray, str, dict]]] = {}
+
+
+def _lsh_bucket(vec):
+    return int(np.packbits((_LSH_PLANES @ vec) > 0)[0])
+
+
+def _embed_room(room_name):
+    try:
+        vec = np.asarray(_get_embedder().embed_query(room_name), dtype=np.float64)
+    except Exception as e:
+        print(f"[WARN] Room embedding failed: {e}")
+        return None
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else None
+
+
+def _semantic_get(vec, digest):
+    entries = [e for e in _semantic_cache.get(_lsh_bucket(vec), ()) if e[1] == digest]
+    if not entries:
+        return None
+    scores = np.stack([v for v, _, _ in entries]) @ vec
+    best = int(np.argmax(scores))
+    return entries[best][2] if scores[best] >= SEMANTIC_THRESHOLD else None
+
+
+def _semantic_set(vec, digest, rule):
+    with _cache_lock:
+        _semantic_cache.setdefault(_lsh_bucket(vec), []).append((vec, digest, rule))
+        arrays = {}
+        for bucket, entries in _semantic_cache.items():
+            arrays[f"b{bucket}_vecs"] = np.stack([v for v, _, _ in entries])
+            arrays[f"b{bucket}_digests"] = np.array([d for _, d, _ in entries])
+            arrays[f"b{bucket}_rules"] = np.array([json.dumps(r) for _, _, r in entries])
+        try:
+            np.savez(SEMANTIC_CACHE_PATH, **arrays)
+        except Exception as e:
+            print(f"[WARN] Semantic cache not saved: {e}")
+
+
+def _load_semantic_cache():
+    if not os.path.exists(SEMANTIC_CACHE_PATH):
+        return
+    try:
+        with np.load(SEMANTIC_CACHE_PATH) as data:
+            for name in data.files:
+                if not name.endswith("_vecs"):
+                    continue
+                bucket = int(name[1:-len("_vecs")])
+                if f"b{bucket}_digests" not in data.files:
+                    continue   # written before entries were tied to a context
+                digests = data[f"b{bucket}_digests"]
+                rules = data[f"b{bucket}_rules"]
+                _semantic_cache[bucket] = [
+                    (v, str(d), json.loads(str(r)))
+                    for v, d, r in zip(data[name], digests, rules)
+                ]
+    except Exception as e:
+        print(f"[WARN] Semantic cache not loaded: {e}")
+
+
+_load_semantic_cache()
+
+
+# ---------------------------------------------------------------------------
+# Singletons — the MiniLM model (~90MB) and the Chroma client are loaded once
+# per process and shared by every caller.
+# ---------------------------------------------------------------------------
+
+class OnnxMiniLMEmbeddings:
+    """
+    all-MiniLM-L6-v2 on ONNX Runtime instead of PyTorch. Expects the int8
+    export from optimum-cli in model_dir (see README). Mean-pooled and
+    L2-normalised, so vectors match the SentenceTransformer model's.
+    Implements the LangChain Embeddings interface (embed_documents /
+    embed_query) without importing langchain_core.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        model_file = next(
+            f for f in ("model_quantized.onnx", "model.onnx")
+            if os.path.exists(os.path.join(model_dir, f))
+        )
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        enc = self.tokenizer(list(texts), padding=True, truncation=True,
+                             max_length=256, return_tensors="np")
+        feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+        mask = enc["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+_EMBEDDER = None
+_VDB = None
+_init_lock = threading.Lock()
+
+
+def _get_embedder():
+    global _EMBEDDER
+    if _EMBEDDER is None:
+        with _init_lock:
+            if _EMBEDDER is None and os.path.isdir(ONNX_MODEL_DIR):
+                try:
+                    _EMBEDDER = OnnxMiniLMEmbeddings(ONNX_MODEL_DIR)
+                except Exception as e:
+                    print(f"[WARN] ONNX embedder unavailable, using PyTorch: {e}")
+            if _EMBEDDER is None:
+                from langchain_community.embeddings import SentenceTransformerEmbeddings
+                _EMBEDDER = SentenceTransformerEmbeddings(
+                    model_name="all-MiniLM-L6-v2"
+                )
+    return _EMBEDDER
+
+
+def _get_vectordb(db_dir=DB_DIR):
+    global _VDB
+    if _VDB is None:
+        from langchain_community.vectorstores import Chroma
+        embeddings = _get_embedder()
+        with _init_lock:
+            if _VDB is None:
+                _VDB = Chroma(persist_directory=db_dir, embedding_function=embeddings)
+    return _VDB
 
 
 def get_embeddings():
-    return SentenceTransformerEmbeddings(
-        model_name="all-MiniLM-L6-v2"
-    )
+    return _get_embedder()
 
 
 def ingest_vastu_knowledge(pdf_dir=PDF_DIR, db_dir=DB_DIR):
     if not os.path.exists(pdf_dir):
         print(f"[ERROR] PDF directory '{pdf_dir}' not found.")
         return None
+    from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    from langchain_community.vectorstores import Chroma
     print(f"[INFO] Loading PDFs from {pdf_dir}...")
     loader = DirectoryLoader(pdf_dir, glob="*.pdf", loader_cls=PyPDFLoader)
     documents = loader.load()
@@ -46,26 +287,62 @@ def ingest_vastu_knowledge(pdf_dir=PDF_DIR, db_dir=DB_DIR):
     return vectordb
 
 def get_vastu_retriever(db_dir=DB_DIR):
-    if not os.path.exists(db_dir):
+    global _VDB
+    if _VDB is None and not os.path.exists(db_dir):
         print("[INFO] Building knowledge base...")
         db = ingest_vastu_knowledge(db_dir=db_dir)
         if db is None:
             return None
-        return db.as_retriever(search_kwargs={"k": 3})
-    embeddings = get_embeddings()
-    vectordb = Chroma(persist_directory=db_dir, embedding_function=embeddings)
-    return vectordb.as_retriever(search_kwargs={"k": 3})
+        _VDB = db
+    return _get_vectordb(db_dir).as_retriever(search_kwargs={"k": 3})
 
 def query_vastu_rules(room_name, retriever):
     if retriever is None:
         return ""
+    key = normalize_room_name(room_name)
+    ctx_key = f"ctx:{_kb_version()}:{key}"
+    cached = _cache_get(ctx_key)
+    if cached is not None:
+        return cached
     try:
-        docs = retriever.invoke(f"Vastu rules for {room_name} location direction zone")
-        return "\n\n".join([d.page_content for d in docs])
+        docs = retriever.invoke(f"Vastu rules for {key} location direction zone")
+        context = "\n\n".join([d.page_content for d in docs])
+        _cache_set(ctx_key, context)
+        return context
     except Exception as e:
         print(f"[ERROR] Retrieval failed: {e}")
         return ""
 
+def query_vastu_rules_batch(room_names, vectordb):
+    """
+    Context for several rooms with one embedding pass.
+    Returns {room_name: context}; cached room types are not re-queried.
+    """
+    contexts = {name: "" for name in room_names}
+    if vectordb is None or not room_names:
+        return contexts
+    keys = {name: normalize_room_name(name) for name in room_names}
+    version = _kb_version()
+    found = {}
+    for key in set(keys.values()):
+        cached = _cache_get(f"ctx:{version}:{key}")
+        if cached is not None:
+            found[key] = cached
+    missing = sorted(set(keys.values()) - set(found))
+    if missing:
+        try:
+            vecs = _get_embedder().embed_documents(
+                [f"Vastu rules for {key} location direction zone" for key in missing])
+            for key, vec in zip(missing, vecs):
+                docs = vectordb.similarity_search_by_vector(vec, k=3)
+                found[key] = "\n\n".join([d.page_content for d in docs])
+                _cache_set(f"ctx:{version}:{key}", found[key])
+        except Exception as e:
+            print(f"[ERROR] Batch retrieval failed: {e}")
+    for name, key in keys.items():
+        contexts[name] = found.get(key, "")
+    return contexts
+
 def get_fallback_constraints(room_name):
     fallbacks = {
         "Kitchen":        {"allowed_quadrants": ["SE"], "forbidden": ["NE", "SW"]},
@@ -81,16 +358,14 @@ def get_fallback_constraints(room_name):
             return {"room": room_name, **fallbacks[key], "reason": "fallback rules"}
     return {"room": room_name, "allowed_quadrants": [], "forbidden": [], "reason": "unknown room"}
 
-def extract_vastu_constraints(room_name, context_text):
-    if not context_text:
-        return get_fallback_constraints(room_name)
-    try:
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            google_api_key=GEMINI_API_KEY,
-            temperature=0
-        )
-        prompt = ChatPromptTemplate.from_template("""
+def get_canonical_constraints(room_name):
+    """Known rule for a standard room type, or None if it needs RAG + LLM."""
+    room_type = _room_type(room_name)
+    if room_type is None:
+        return None
+    return {**get_fallback_constraints(room_type), "room": room_name}
+
+_EXTRACTION_PROMPT = """
 You are a Vastu Shastra expert.
 Based on this context, extract Vastu zones for {room}.
 Valid zones: NE, E, SE, S, SW, W, NW, N, C
@@ -99,11 +374,50 @@ Context: {context}
 
 Reply ONLY with valid JSON, no markdown:
 {{"room": "{room}", "allowed_quadrants": ["zone1"], "forbidden": ["zone2"], "reason": "brief reason"}}
-        """)
-        chain = prompt | llm
+        """
+
+_CHAIN = None
+
+
+def _get_extraction_chain():
+    """prompt | llm, built on first use and shared by every extraction."""
+    global _CHAIN
+    if _CHAIN is None:
+        with _init_lock:
+            if _CHAIN is None:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                from langchain_core.prompts import ChatPromptTemplate
+                llm = ChatGoogleGenerativeAI(
+                    model="gemini-1.5-flash",
+                    google_api_key=GEMINI_API_KEY,
+                    temperature=0
+                )
+                _CHAIN = ChatPromptTemplate.from_template(_EXTRACTION_PROMPT) | llm
+    return _CHAIN
+
+
+def extract_vastu_constraints(room_name, context_text):
+    if not context_text:
+        return get_fallback_constraints(room_name)
+    digest = hashlib.md5(context_text.encode("utf-8")).hexdigest()
+    cache_key = f"rule:{normalize_room_name(room_name)}:{digest}"
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return {**cached, "room": room_name}
+    vec = _embed_room(room_name)
+    if vec is not None:
+        similar = _semantic_get(vec, digest)
+        if similar is not None:
+            return {**similar, "room": room_name}
+    try:
+        chain = _get_extraction_chain()
         result = chain.invoke({"room": room_name, "context": context_text})
         text = result.content.strip().replace("```json", "").replace("```", "").strip()
-        return json.loads(text)
+        rule = json.loads(text)
+        _cache_set(cache_key, rule)
+        if vec is not None:
+            _semantic_set(vec, digest, rule)
+        return rule
     except Exception as e:
         print(f"[ERROR] Gemini extraction failed: {e}")
         return get_fallback_constraints(room_name)
@@ -2,9 +2,10 @@ import streamlit as st
 import io
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 load_dotenv()
-from src.rag.vastu_rag_engine import get_vastu_retriever, query_vastu_rules, ConstraintExtractor
+from src.rag.vastu_rag_engine import get_vastu_retriever, query_vastu_rules_batch, get_canonical_constraints, extract_vastu_constraints, normalize_room_name
 from src.core.spatial_optimizer import Room, VastuConstraint, generate_layout
 from src.export.vastu_engine import generate_ai_detailed_plan
 from .vastu_renderer import render_preview_plan
@@ -29,14 +30,9 @@ except Exception as e:
 
 st.sidebar.title("🏗️ Project Config")
 
-# API Configuration
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    GROQ_API_KEY = st.sidebar.text_input("Groq API Key", type="password", help="Get your key from https://console.groq.com/")
-    if not GROQ_API_KEY:
-        st.sidebar.warning("⚠️ GROQ_API_KEY missing. AI logic will use fallback patterns.")
-
-extractor = ConstraintExtractor(api_key=GROQ_API_KEY)
+# API Configuration — rule extraction runs on Gemini (see vastu_rag_engine)
+if not os.getenv("GEMINI_API_KEY"):
+    st.sidebar.warning("⚠️ GEMINI_API_KEY missing. Non-standard rooms will use fallback rules.")
 
 client = st.sidebar.text_input("Client Name", "Mr. Sharma")
 
@@ -81,13 +77,41 @@ if st.button("✨ Generate Optimized Layout", type="primary"):
         
         progress_bar = st.progress(0)
         
-        for idx, room in enumerate(rooms_req):
-            if retriever:
-                # 1. RAG Retrieval
-                context = query_vastu_rules(room.name, retriever)
-                
-                # 2. LLM Extraction (Mocked)
-                rule_json = extractor.extract_constraints(room.name, context)
+        # Same room type → one retrieval + one LLM call per click
+        rules_by_type = {}
+        
+        # 0. Standard rooms (Kitchen, Bedroom, Living, Toilet...) have known rules
+        for room in rooms_req:
+            room_type = normalize_room_name(room.name)
+            if room_type not in rules_by_type:
+                canonical = get_canonical_constraints(room.name)
+                if canonical:
+                    rules_by_type[room_type] = canonical
+        unknown_rooms = [r for r in rooms_req if normalize_room_name(r.name) not in rules_by_type]
+        
+        if retriever and unknown_rooms:
+            # 1. RAG Retrieval (unknown rooms only, one embedding pass)
+            contexts = query_vastu_rules_batch([r.name for r in unknown_rooms], retriever.vectorstore)
+            
+            first_of_type = {}
+            for room in unknown_rooms:
+                first_of_type.setdefault(normalize_room_name(room.name), room)
+            
+            # 2. LLM Extraction — network bound, so one thread per room type.
+            # Widgets are only updated here, on the script thread.
+            with ThreadPoolExecutor(max_workers=min(8, len(first_of_type))) as ex:
+                futures = {
+                    ex.submit(extract_vastu_constraints, room.name, contexts[room.name]): room_type
+                    for room_type, room in first_of_type.items()
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    rules_by_type[futures[future]] = future.result()
+                    progress_bar.progress(done / len(futures))
+        
+        for room in rooms_req:
+            room_type = normalize_room_name(room.name)
+            if room_type in rules_by_type:
+                rule_json = {**rules_by_type[room_type], 'room': room.name}
                 
                 # 3. Create Constraint Object
                 vc = VastuConstraint(room.name, rule_json['allowed_quadrants'])
@@ -96,8 +120,8 @@ if st.button("✨ Generate Optimized Layout", type="primary"):
                 # Store tip for UI
                 if rule_json['allowed_quadrants']:
                     vastu_tips.append(f"**{room.name}**: Best in {', '.join(rule_json['allowed_quadrants'])}")
-            
-            progress_bar.progress((idx + 1) / len(rooms_req))
+        
+        progress_bar.progress(1.0)
 
         st.success("Analysis Complete!")
         
@@ -1,12 +1,29 @@
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import PatchCollection
+from matplotlib.figure import Figure
+import numpy as np
+import shapely
+import streamlit as st
 from shapely.geometry import Polygon
 
+def _get_canvas():
+    """
+    One Figure/Axes pair per browser session, cleared and redrawn on every
+    Generate click. Kept in session_state (not cache_resource) so concurrent
+    sessions never draw into the same Axes, and built without pyplot so the
+    global figure manager does not keep it alive after the session ends.
+    """
+    if "_preview_canvas" not in st.session_state:
+        fig = Figure(figsize=(10, 8))
+        st.session_state["_preview_canvas"] = (fig, fig.subplots())
+    return st.session_state["_preview_canvas"]
+
 def render_preview_plan(rooms, plot_width, plot_height, client_name):
     """
     Renders the optimized layout from Room objects.
     """
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig, ax = _get_canvas()
+    ax.clear()
     ax.set_facecolor('#f0f0f0')
 
     # Draw Plot Boundary
@@ -22,30 +39,35 @@ def render_preview_plan(rooms, plot_width, plot_height, client_name):
         'Puja': '#FFDAB9'
     }
 
-    for room in rooms:
-        if not room.current_poly:
-            continue
-            
-        # Get coordinates
-        x, y = room.current_poly.exterior.coords.xy
-        
+    rooms = [r for r in rooms if r.current_poly]
+
+    # All room outlines in one GEOS call, split back per room
+    coords, idx = shapely.get_coordinates(
+        np.array([r.current_poly.exterior for r in rooms], dtype=object), return_index=True)
+    outlines = np.split(coords, np.flatnonzero(np.diff(idx)) + 1)
+
+    room_patches, face_colors = [], []
+    for room, outline in zip(rooms, outlines):
         # Determine color
         c = colors.get(room.name, '#ADD8E6')
         if "Bed" in room.name: c = colors['Bedroom']
         
-        # Draw Polygon
-        poly_patch = patches.Polygon(list(zip(x, y)), closed=True,
-                                     linewidth=2, edgecolor='black', facecolor=c, alpha=0.7)
-        ax.add_patch(poly_patch)
+        room_patches.append(patches.Polygon(outline, closed=True))
+        face_colors.append(c)
         
         # Add Label
-        # Use dynamic centroid in case room.center is stale
-        cx, cy = room.current_poly.centroid.x, room.current_poly.centroid.y
+        # Rooms are axis-aligned boxes: centre of the outline's bounds is the
+        # centroid, without building a GEOS Point (room.center may be stale)
+        cx, cy = (outline.min(axis=0) + outline.max(axis=0)) / 2
         ax.text(cx, cy, room.name, ha='center', va='center', fontsize=9, weight='bold')
 
-    plt.xlim(-1, plot_width + 1)
-    plt.ylim(-1, plot_height + 1)
-    plt.title(f"AI Vastu Plan: {client_name}", fontsize=14)
+    # Draw all room polygons in one artist
+    ax.add_collection(PatchCollection(room_patches, facecolors=face_colors,
+                                      edgecolors='black', linewidths=2, alpha=0.7))
+
+    ax.set_xlim(-1, plot_width + 1)
+    ax.set_ylim(-1, plot_height + 1)
+    ax.set_title(f"AI Vastu Plan: {client_name}", fontsize=14)
     ax.set_aspect('equal')
     
     return fig